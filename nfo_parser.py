@@ -6,59 +6,363 @@ NFO文件解析器
 """
 
 import os
+import shelve
+import hashlib
+import html
+import io
+import sys
+import threading
+import types
+import functools
+import importlib.util
 import xml.etree.ElementTree as ET
 import re
+from collections import defaultdict
 from pathlib import Path
 from typing import List, Dict, Optional
-import argparse
 from datetime import datetime
-import webbrowser
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
-# 尝试导入可选依赖
+# 检查可选依赖是否已安装，真正导入推迟到用到时，只生成Markdown时无需加载
+MARKDOWN_AVAILABLE = importlib.util.find_spec('markdown') is not None
+PDFKIT_AVAILABLE = importlib.util.find_spec('pdfkit') is not None
+
+# 优先使用基于libxml2的lxml解析XML，未安装时回退到标准库
 try:
-    import markdown
-    import pdfkit
-    MARKDOWN_AVAILABLE = True
-    PDFKIT_AVAILABLE = True
+    from lxml import etree as LET
+    LXML_AVAILABLE = True
+    _XML_PARSE_ERRORS = (LET.XMLSyntaxError, ET.ParseError)
 except ImportError:
-    MARKDOWN_AVAILABLE = False
-    PDFKIT_AVAILABLE = False
+    LXML_AVAILABLE = False
+    _XML_PARSE_ERRORS = (ET.ParseError,)
+
+# 无tag视频的分类名
+_UNCATEGORIZED = sys.intern('未分类')
+
+# nfo文件大小上限，超过则视为非nfo文件直接跳过
+_MAX_NFO_SIZE = 2 * 1024 * 1024
+
+# 解析结果缓存文件名，解析逻辑变化导致缓存内容不兼容时递增版本号；
+# 所在目录在打开缓存时才确定，无法确定用户主目录时不影响导入
+_CACHE_NAME = 'parsed-v1'
+
+# 并发解析nfo文件的线程数，用于重叠网络目录（SMB）上的读取延迟
+_PARSE_WORKERS = 32
+
+# 预编译的正则表达式
+# nfo字段提取，一次扫描同时匹配title、tag、plot；下面的查找标记、正则和解析缓存的条目格式均由此派生，
+# 增减字段后需递增_CACHE_NAME中的版本号
+_NFO_FIELD_NAMES = ('title', 'tag', 'plot')
+_NFO_FIELDS = frozenset(_NFO_FIELD_NAMES)
+# 文本格式nfo直接在原始字节上查找，优先用find定位的起止标记
+_FIELD_MARKERS = tuple(
+    (field, f'<{field}>'.encode('ascii'), f'</{field}>'.encode('ascii'))
+    for field in _NFO_FIELD_NAMES
+)
+# find找不到时的正则回退，允许标签带属性
+_FIELDS_RE = re.compile(
+    rb'<(?P<tag>' + b'|'.join(re.escape(field.encode('ascii')) for field in _NFO_FIELD_NAMES)
+    + rb')(?:\s[^>]*)?>(?P<val>.*?)</(?P=tag)>',
+    re.DOTALL
+)
+# 正则匹配到的字节标签名到字段名的映射，免去每次匹配的解码
+_FIELD_NAMES_BY_TAG = {field.encode('ascii'): field for field in _NFO_FIELD_NAMES}
+
+# 锚点生成
+_NONWORD_RE = re.compile(r'[^\w\s\u4e00-\u9fff]')
+
+# _build_html中单个视频章节的模板：带锚点的标题、类型、概要和分隔线
+_HTML_ITEM_TEMPLATE = (
+    '<h2 id="{anchor}">视频标题：{title}</h2>\n'
+    '<h3>视频类型：{tag}</h3>\n'
+    '<h3>视频概要</h3>\n'
+    '{plot}\n'
+    '<hr>'
+)
+
+# 简单markdown到HTML转换，仅在未安装markdown库时使用，首次调用时经_rx编译
+# 标题、分隔线、列表项和链接合并为一个模式，单次扫描完成替换
+_MD_PATTERN = (
+    r'^(?P<hashes>#{1,3}) (?P<heading>.*)$'
+    r'|(?P<hr>^---$)'
+    r'|^- (?P<item>.*)$'
+    r'|\[(?P<text>[^\]]+)\]\((?P<href>[^)]+)\)'
+)
+_MD_LINK_PATTERN = r'\[([^\]]+)\]\(([^)]+)\)'
+_MD_UL_PATTERN = r'(<li>.*</li>)'
+
+
+@functools.lru_cache(maxsize=64)
+def _rx(pattern: str, flags: int = 0) -> 're.Pattern':
+    """
+    编译并缓存运行时使用的正则表达式
+
+    re模块内部缓存是全局共享的，条目可能被其他代码挤出；
+    这里的缓存只存放本模块的模式，编译结果在进程内一直有效。
+
+    Args:
+        pattern: 正则表达式
+        flags: 编译标志
+
+    Returns:
+        编译后的正则表达式对象
+    """
+    return re.compile(pattern, flags)
+
+
+@functools.lru_cache(maxsize=None)
+def _anchor(text: str) -> str:
+    """
+    生成锚点字符串，同一标题只计算一次
+
+    Args:
+        text: 要生成锚点的文本
+
+    Returns:
+        锚点字符串
+    """
+    # 移除特殊字符，保留中文、英文、数字和空格
+    anchor = _NONWORD_RE.sub('', text)
+    # 将空格替换为连字符：str.split()按连续空白切分并去掉首尾空白，
+    # 与strip()后再替换\s+等价，但字符循环在C中完成，无需第二次正则扫描
+    return '-'.join(anchor.split()).lower()
+
+
+def _md_replace(match: 're.Match') -> str:
+    """
+    根据_MD_PATTERN匹配到的分组返回对应的HTML片段
+
+    Args:
+        match: _MD_PATTERN的匹配结果
+
+    Returns:
+        HTML片段
+    """
+    kind = match.lastgroup
+    if kind == 'heading':
+        level = len(match['hashes'])
+        # 标题和列表项中的链接同样需要转换
+        heading = _rx(_MD_LINK_PATTERN).sub(r'<a href="\2">\1</a>', match['heading'])
+        return f'<h{level}>{heading}</h{level}>'
+    if kind == 'item':
+        item = _rx(_MD_LINK_PATTERN).sub(r'<a href="\2">\1</a>', match['item'])
+        return f'<li>{item}</li>'
+    if kind == 'hr':
+        return '<hr>'
+    return f'<a href="{match["href"]}">{match["text"]}</a>'
+
+
+def parse_nfo_file(nfo_path: str) -> Optional[Dict[str, str]]:
+    """
+    解析单个nfo文件
+
+    Args:
+        nfo_path: nfo文件路径
+
+    Returns:
+        包含title、tag、plot的字典，解析失败返回None
+    """
+    try:
+        # 一次read()读入整个文件：网络目录上只需一次往返，且读取期间释放GIL，
+        # 线程池中的其他文件可同时读取（内存映射的缺页读取在持有GIL时发生）
+        with open(nfo_path, 'rb', buffering=0) as file:
+            content = file.read()
+
+        # 尝试流式解析为XML
+        try:
+            return _parse_xml_nfo(content, nfo_path)
+        except _XML_PARSE_ERRORS:
+            # 如果不是标准XML，尝试文本方式解析
+            return _parse_text_nfo(content, nfo_path)
+
+    except Exception as e:
+        print(f"解析文件 {nfo_path} 时出错: {e}")
+        return None
+
+
+def _iter_field_elements(content: bytes):
+    """
+    流式遍历根元素下的title、tag、plot子元素，其他元素不返回
+
+    Args:
+        content: 文件内容
+
+    Yields:
+        字段元素，遍历过的元素随即清空释放，内存占用与单个元素相当
+    """
+    if LXML_AVAILABLE:
+        # lxml在libxml2中按标签过滤，只为目标元素产生事件；
+        # 与标准库expat一致，不解析外部实体、不访问网络，避免把本地文件内容带入汇总
+        events = LET.iterparse(io.BytesIO(content), events=('end',), tag=_NFO_FIELD_NAMES,
+                               remove_blank_text=True, huge_tree=False,
+                               resolve_entities=False, no_network=True)
+        for _, elem in events:
+            parent = elem.getparent()
+            if parent is not None and parent.getparent() is None:
+                yield elem
+            elem.clear()
+        return
+
+    # 标准库iterparse不支持标签过滤，通过start/end事件计算深度
+    depth = 0
+    for event, elem in ET.iterparse(io.BytesIO(content), events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1 and elem.tag in _NFO_FIELDS:
+            yield elem
+        elem.clear()
+
+
+def _parse_xml_nfo(content: bytes, nfo_path: str) -> Dict[str, str]:
+    """
+    使用iterparse流式解析XML格式的nfo文件，不构建完整的文档树
+
+    Args:
+        content: 文件内容
+        nfo_path: 文件路径
+
+    Returns:
+        包含解析数据的字典
+    """
+    data = dict.fromkeys(_NFO_FIELD_NAMES, '')
+    data['file_path'] = nfo_path
+    data['directory'] = os.path.dirname(nfo_path)
+
+    # 同名元素只取第一个；全部字段找到后提前结束
+    found = set()
+    for elem in _iter_field_elements(content):
+        if elem.tag not in found:
+            found.add(elem.tag)
+            if elem.text:
+                data[elem.tag] = elem.text.strip()
+            if len(found) == len(_NFO_FIELDS):
+                break
+
+    return data
+
+
+def _parse_text_nfo(content: bytes, nfo_path: str) -> Dict[str, str]:
+    """
+    解析文本格式的nfo文件
+
+    Args:
+        content: 文件内容
+        nfo_path: 文件路径
+
+    Returns:
+        包含解析数据的字典
+    """
+    data = dict.fromkeys(_NFO_FIELD_NAMES, '')
+    data['file_path'] = nfo_path
+    data['directory'] = os.path.dirname(nfo_path)
+
+    # 常见情况直接用find切片提取，不经过正则引擎；只解码提取出的字段
+    found = set()
+    for field, open_tag, close_tag in _FIELD_MARKERS:
+        start = content.find(open_tag)
+        if start == -1:
+            continue
+        start += len(open_tag)
+        end = content.find(close_tag, start)
+        if end != -1:
+            found.add(field)
+            data[field] = content[start:end].decode('utf-8').strip()
+
+    # 仍有字段未找到时（如标签带属性），用正则一次扫描补齐，同名字段只取第一个
+    if len(found) < len(_NFO_FIELDS):
+        for match in _FIELDS_RE.finditer(content):
+            field = _FIELD_NAMES_BY_TAG[match['tag']]
+            if field not in found:
+                found.add(field)
+                data[field] = match['val'].decode('utf-8').strip()
+                if len(found) == len(_NFO_FIELDS):
+                    break
+
+    return data
 
 
 class NfoParser:
     """NFO文件解析器类"""
     
-    def __init__(self, base_directory: str):
+    def __init__(self, base_directory: str, use_cache: bool = True):
         """
         初始化解析器
         
         Args:
             base_directory: 要扫描的基础目录路径
+            use_cache: 是否使用磁盘缓存跳过未变化的nfo文件
         """
         self.base_directory = Path(base_directory)
+        self.use_cache = use_cache
         self.video_data = []
-        
-    def find_nfo_files(self) -> List[Path]:
+        # find_nfo_files()记录的文件签名，键为文件路径，值为(st_mtime_ns, st_size)
+        self._file_stats = {}
+        # find_nfo_files()记录的文件inode号，用于按磁盘顺序读取
+        self._file_inodes = {}
+        # 已生成的markdown内容行，键为id(video_data)
+        # 值为(video_data, 内容行列表)
+        self._markdown_cache = {}
+        # 按tag分组后的数据，由_grouped()惰性计算
+        self._categorized = None
+        self._categorized_source = None
+        # markdown_to_html()的结果，键为markdown内容的blake2b摘要
+        self._html_cache = {}
+        # 生成时间，同一批数据的各格式输出共用
+        self._generated_at = None
+        
+    def find_nfo_files(self) -> List[str]:
         """
         递归查找所有nfo文件
         
         Returns:
-            nfo文件路径列表
+            nfo文件路径列表，直接使用DirEntry.path字符串，不构造Path对象
         """
         nfo_files = []
+        self._file_stats = {}
+        self._file_inodes = {}
         if not self.base_directory.exists():
             print(f"错误：目录 {self.base_directory} 不存在")
             return nfo_files
             
-        # 递归查找所有.nfo文件
-        for nfo_file in self.base_directory.rglob("*.nfo"):
-            nfo_files.append(nfo_file)
+        # 基于os.scandir的栈式递归遍历，DirEntry复用readdir返回的类型信息，无需逐项stat
+        stack = [str(self.base_directory)]
+        while stack:
+            directory = stack.pop()
+            subdirectories = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirectories.append(entry.path)
+                        elif entry.name.endswith('.nfo'):
+                            # is_file()和stat()会跟随符号链接，单个损坏的条目只跳过该文件
+                            try:
+                                if not entry.is_file():
+                                    continue
+                                # 复用DirEntry的stat结果，空文件和过大的文件无需打开读取
+                                stat = entry.stat()
+                            except OSError as e:
+                                print(f"无法读取文件 {entry.path}: {e}")
+                                continue
+                            if 0 < stat.st_size <= _MAX_NFO_SIZE:
+                                nfo_files.append(entry.path)
+                                self._file_stats[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                                # inode()直接取自readdir结果，无需额外系统调用
+                                self._file_inodes[entry.path] = entry.inode()
+                            else:
+                                print(f"跳过空文件或过大的文件: {entry.path}")
+            except OSError as e:
+                # 与rglob一致，跳过无权限访问的子目录
+                print(f"无法读取目录 {directory}: {e}")
+            # 子目录逆序入栈，出栈顺序即readdir顺序，与rglob的先序遍历一致
+            stack.extend(reversed(subdirectories))
             
         print(f"找到 {len(nfo_files)} 个nfo文件")
         return nfo_files
     
-    def parse_nfo_file(self, nfo_path: Path) -> Optional[Dict[str, str]]:
+    def parse_nfo_file(self, nfo_path: str) -> Optional[Dict[str, str]]:
         """
         解析单个nfo文件
         
@@ -68,117 +372,156 @@ class NfoParser:
         Returns:
             包含title、tag、plot的字典，解析失败返回None
         """
+        return parse_nfo_file(nfo_path)
+    
+    def process_all_nfo_files(self) -> List[Dict[str, str]]:
+        """
+        处理所有nfo文件
+        
+        Returns:
+            所有解析数据的列表
+        """
+        nfo_files = self.find_nfo_files()
+        cache = self._open_cache()
         try:
-            with open(nfo_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-                
-            # 尝试解析为XML
-            try:
-                root = ET.fromstring(content)
-                return self._parse_xml_nfo(root, nfo_path)
-            except ET.ParseError:
-                # 如果不是标准XML，尝试正则表达式解析
-                return self._parse_text_nfo(content, nfo_path)
-                
-        except Exception as e:
-            print(f"解析文件 {nfo_path} 时出错: {e}")
-            return None
+            processed_data = self._parse_nfo_files(nfo_files, cache)
+        finally:
+            if cache is not None:
+                try:
+                    cache.close()
+                except Exception as e:
+                    print(f"关闭缓存文件时出错: {e}")
+        
+        self.video_data = processed_data
+        self._markdown_cache.clear()
+        self._html_cache.clear()
+        self._categorized = None
+        self._generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"成功处理 {len(processed_data)} 个有效文件")
+        return processed_data
     
-    def _parse_xml_nfo(self, root: ET.Element, nfo_path: Path) -> Dict[str, str]:
+    def _parse_nfo_files(self, nfo_files: List[str], cache: Optional[shelve.Shelf]) -> List[Dict[str, str]]:
         """
-        解析XML格式的nfo文件
+        解析nfo文件列表，未变化的文件使用缓存结果
         
         Args:
-            root: XML根元素
-            nfo_path: 文件路径
+            nfo_files: find_nfo_files()返回的文件路径列表
+            cache: _open_cache()打开的缓存，为None时全部重新解析
             
         Returns:
-            包含解析数据的字典
+            有标题的解析数据列表，顺序与文件列表一致
         """
-        data = {
-            'title': '',
-            'tag': '',
-            'plot': '',
-            'file_path': str(nfo_path),
-            'directory': str(nfo_path.parent)
-        }
-        
-        # 提取title
-        title_elem = root.find('title')
-        if title_elem is not None and title_elem.text:
-            data['title'] = title_elem.text.strip()
-        
-        # 提取tag
-        tag_elem = root.find('tag')
-        if tag_elem is not None and tag_elem.text:
-            data['tag'] = tag_elem.text.strip()
-        
-        # 提取plot
-        plot_elem = root.find('plot')
-        if plot_elem is not None and plot_elem.text:
-            data['plot'] = plot_elem.text.strip()
-            
-        return data
+        processed_data = []
+        # 缓存以绝对路径为键
+        cache_keys = [os.path.abspath(nfo_file) for nfo_file in nfo_files] if cache is not None else []
+        
+        # 修改时间和大小都未变化的文件直接使用缓存的解析结果
+        results = [None] * len(nfo_files)
+        pending = []
+        for index, nfo_file in enumerate(nfo_files):
+            if cache is not None:
+                results[index] = self._load_cached(cache, cache_keys[index], nfo_file)
+            if results[index] is None:
+                pending.append(index)
+        
+        # 按inode顺序提交读取，本地磁盘上更接近顺序访问，预读效果更好；
+        # 结果按原下标写回，顺序仍与文件列表一致
+        pending.sort(key=lambda index: self._file_inodes.get(nfo_files[index], 0))
+        
+        # 解析以等待文件读取为主，用线程池并发处理
+        with ThreadPoolExecutor(max_workers=_PARSE_WORKERS) as executor:
+            parsed = executor.map(parse_nfo_file, [nfo_files[index] for index in pending])
+            for index, data in zip(pending, parsed):
+                results[index] = data
+        
+        if cache is not None:
+            self._update_cache(cache, cache_keys, [
+                (cache_keys[index], nfo_files[index], results[index]) for index in pending
+            ])
+            if nfo_files:
+                print(f"缓存命中 {len(nfo_files) - len(pending)} 个文件，重新解析 {len(pending)} 个文件")
+        
+        for nfo_file, data in zip(nfo_files, results):
+            print(f"正在处理: {nfo_file}")
+            if data and data['title']:  # 只添加有标题的数据
+                # tag取值很少且反复出现，驻留后所有条目共享同一字符串对象；
+                # 同一目录下的剧集共用目录路径，同样驻留
+                data['tag'] = sys.intern(data['tag'])
+                data['directory'] = sys.intern(data['directory'])
+                processed_data.append(data)
+            else:
+                print(f"跳过无效文件: {nfo_file}")
+        
+        return processed_data
     
-    def _parse_text_nfo(self, content: str, nfo_path: Path) -> Dict[str, str]:
+    def _load_cached(self, cache: shelve.Shelf, cache_key: str, nfo_file: str) -> Optional[Dict[str, str]]:
         """
-        使用正则表达式解析文本格式的nfo文件
+        读取单个nfo文件的缓存解析结果
         
         Args:
-            content: 文件内容
-            nfo_path: 文件路径
+            cache: _open_cache()打开的缓存
+            cache_key: 文件的绝对路径
+            nfo_file: find_nfo_files()返回的文件路径
             
         Returns:
-            包含解析数据的字典
+            解析数据字典，未命中或文件已变化时返回None
         """
-        data = {
-            'title': '',
-            'tag': '',
-            'plot': '',
-            'file_path': str(nfo_path),
-            'directory': str(nfo_path.parent)
-        }
-        
-        # 使用正则表达式提取信息
-        title_pattern = r'<title>(.*?)</title>'
-        tag_pattern = r'<tag>(.*?)</tag>'
-        plot_pattern = r'<plot>(.*?)</plot>'
-        
-        title_match = re.search(title_pattern, content, re.DOTALL)
-        if title_match:
-            data['title'] = title_match.group(1).strip()
-        
-        tag_match = re.search(tag_pattern, content, re.DOTALL)
-        if tag_match:
-            data['tag'] = tag_match.group(1).strip()
-        
-        plot_match = re.search(plot_pattern, content, re.DOTALL)
-        if plot_match:
-            data['plot'] = plot_match.group(1).strip()
-            
+        try:
+            mtime_ns, size, *values = cache[cache_key]
+        except Exception:
+            # 未缓存、条目损坏或格式不兼容均按未命中处理，重新解析
+            return None
+        if (mtime_ns, size) != self._file_stats.get(nfo_file) or len(values) != len(_NFO_FIELD_NAMES):
+            return None
+        data = dict(zip(_NFO_FIELD_NAMES, values))
+        data['file_path'] = nfo_file
+        data['directory'] = os.path.dirname(nfo_file)
         return data
     
-    def process_all_nfo_files(self) -> List[Dict[str, str]]:
+    def _update_cache(self, cache: shelve.Shelf, cache_keys: List[str], parsed: List[tuple]):
         """
-        处理所有nfo文件
+        写入新解析的结果，并删除扫描目录下已不存在的文件的缓存
         
-        Returns:
-            所有解析数据的列表
+        Args:
+            cache: _open_cache()打开的缓存
+            cache_keys: 本次扫描到的所有文件的缓存键
+            parsed: 新解析文件的(缓存键, 文件路径, 解析数据)列表
         """
-        nfo_files = self.find_nfo_files()
-        processed_data = []
-        
-        for nfo_file in nfo_files:
-            print(f"正在处理: {nfo_file}")
-            data = self.parse_nfo_file(nfo_file)
-            if data and data['title']:  # 只添加有标题的数据
-                processed_data.append(data)
-            else:
-                print(f"跳过无效文件: {nfo_file}")
+        try:
+            for cache_key, nfo_file, data in parsed:
+                signature = self._file_stats.get(nfo_file)
+                # 解析失败的文件不缓存，下次运行重新解析
+                if data is not None and signature is not None:
+                    cache[cache_key] = (*signature, *(data[field] for field in _NFO_FIELD_NAMES))
+            
+            # 删除或改名的文件不会再被扫描到，清除其条目避免缓存无限增长
+            prefix = os.path.join(os.path.abspath(self.base_directory), '')
+            seen = set(cache_keys)
+            for cache_key in [key for key in cache.keys() if key.startswith(prefix) and key not in seen]:
+                del cache[cache_key]
+        except Exception as e:
+            # 磁盘已满、目录只读等情况下放弃更新缓存，不影响本次结果
+            print(f"更新缓存时出错，本次解析结果未全部缓存: {e}")
+    
+    def _open_cache(self) -> Optional[shelve.Shelf]:
+        """
+        打开解析结果的磁盘缓存
         
-        self.video_data = processed_data
-        print(f"成功处理 {len(processed_data)} 个有效文件")
-        return processed_data
+        Returns:
+            缓存对象，禁用缓存或打开失败时返回None
+        """
+        if not self.use_cache:
+            return None
+        cache_file = _CACHE_NAME
+        try:
+            cache_dir = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'nfo_parser'
+            cache_file = cache_dir / _CACHE_NAME
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            # 固定使用pickle协议4，Python 3.6/3.7也能读取其他版本写入的缓存
+            return shelve.open(str(cache_file), 'c', protocol=4)
+        except Exception as e:
+            print(f"无法打开缓存文件 {cache_file}，将重新解析所有文件: {e}")
+            return None
     
     def _generate_anchor(self, text: str) -> str:
         """
@@ -190,19 +533,42 @@ class NfoParser:
         Returns:
             锚点字符串
         """
-        import re
-        # 移除特殊字符，保留中文、英文、数字和空格
-        anchor = re.sub(r'[^\w\s\u4e00-\u9fff]', '', text)
-        # 将空格替换为连字符
-        anchor = re.sub(r'\s+', '-', anchor.strip())
-        return anchor.lower()
+        return _anchor(text)
+    
+    def _timestamp(self) -> str:
+        """
+        获取生成时间，首次调用时确定，之后各格式输出保持一致
+        
+        Returns:
+            格式化的生成时间字符串
+        """
+        if self._generated_at is None:
+            self._generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return self._generated_at
+    
+    def _grouped(self) -> Dict[str, List[Dict[str, str]]]:
+        """
+        按tag分组视频数据，只遍历一次并在各生成方法间复用
+        
+        Returns:
+            按tag排序的tag到视频数据列表的字典，无tag的视频归入"未分类"
+        """
+        if self._categorized is None or self._categorized_source is not self.video_data:
+            categorized_data = defaultdict(list)
+            for item in self.video_data:
+                categorized_data[item['tag'] or _UNCATEGORIZED].append(item)
+            # 按tag排序后保存，各生成方法无需再各自排序
+            self._categorized = {tag: categorized_data[tag] for tag in sorted(categorized_data)}
+            self._categorized_source = self.video_data
+        return self._categorized
     
-    def generate_markdown(self, output_file: str = None) -> str:
+    def generate_markdown(self, output_file: str = None, markdown_text: str = None) -> str:
         """
         生成markdown文件
         
         Args:
             output_file: 输出文件路径，默认为当前目录下的汇总文件
+            markdown_text: 已生成的markdown内容，默认调用build_markdown_string()生成
             
         Returns:
             生成的markdown内容
@@ -211,72 +577,15 @@ class NfoParser:
             print("没有数据可生成markdown")
             return ""
         
-        # 生成markdown内容
-        markdown_content = []
-        markdown_content.append("# 心理科普视频内容汇总")
-        markdown_content.append("")
-        markdown_content.append(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        markdown_content.append(f"总计视频数量: {len(self.video_data)}")
-        markdown_content.append("")
-        
-        # 生成目录（无跳转链接）
-        markdown_content.append("## 📋 目录")
-        markdown_content.append("")
-        
-        # 按类型分组生成目录
-        categorized_data = {}
-        for item in self.video_data:
-            tag = item['tag'] if item['tag'] else '未分类'
-            if tag not in categorized_data:
-                categorized_data[tag] = []
-            categorized_data[tag].append(item)
-        
-        # 生成目录结构（无跳转链接）
-        for tag, items in sorted(categorized_data.items()):
-            markdown_content.append(f"### {tag}")
-            for item in items:
-                markdown_content.append(f"- {item['title']}")
-            markdown_content.append("")
-        
-        markdown_content.append("---")
-        markdown_content.append("")
-        
-        # 按视频生成内容，每个视频一个独立章节
-        for item in self.video_data:
-            # 视频标题作为二级标题
-            markdown_content.append(f"## 视频标题：{item['title']}")
-            markdown_content.append("")
-            
-            # 类型作为三级标题
-            tag = item['tag'] if item['tag'] else '未分类'
-            markdown_content.append(f"### 视频类型：{tag}")
-            markdown_content.append("")
-            
-            # 概要部分
-            markdown_content.append("### 视频概要")
-            if item['plot']:
-                # 格式化plot内容，保持原有的换行和缩进
-                plot_lines = item['plot'].split('\n')
-                for line in plot_lines:
-                    if line.strip():
-                        markdown_content.append(line)
-                    else:
-                        markdown_content.append("")
-            else:
-                markdown_content.append("暂无概要信息")
-            
-            markdown_content.append("")
-            markdown_content.append("---")
-            markdown_content.append("")
-        
-        markdown_text = '\n'.join(markdown_content)
+        if markdown_text is None:
+            markdown_text = self.build_markdown_string()
         
         # 写入文件
         if output_file is None:
             output_file = self.base_directory / "心理科普视频内容汇总.md"
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(markdown_text)
+        # 一次性编码后以单次二进制写入，避免文本模式的增量编码
+        Path(output_file).write_bytes(markdown_text.encode('utf-8'))
         
         print(f"Markdown文件已生成: {output_file}")
         return markdown_text
@@ -295,17 +604,8 @@ class NfoParser:
             print("没有数据可生成HTML")
             return ""
         
-        # 首先生成带跳转功能的markdown内容
-        markdown_content = self._generate_markdown_content_with_toc()
-        
-        if MARKDOWN_AVAILABLE:
-            # 使用markdown库转换为HTML
-            html_content = markdown.markdown(markdown_content, extensions=['toc', 'tables', 'fenced_code'])
-            # 修复锚点格式
-            html_content = self._fix_anchor_links(html_content)
-        else:
-            # 简单的markdown到HTML转换
-            html_content = self._simple_markdown_to_html(markdown_content)
+        # 直接构建带跳转功能的HTML内容，无需经过markdown转换
+        html_content = self._build_html()
         
         # 添加HTML模板
         full_html = f"""<!DOCTYPE html>
@@ -388,18 +688,19 @@ class NfoParser:
         if output_file is None:
             output_file = self.base_directory / "心理科普视频内容汇总.html"
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(full_html)
+        # 一次性编码后以单次二进制写入，避免文本模式的增量编码
+        Path(output_file).write_bytes(full_html.encode('utf-8'))
         
         print(f"HTML文件已生成: {output_file}")
         return full_html
     
-    def generate_pdf(self, output_file: str = None) -> str:
+    def generate_pdf(self, output_file: str = None, html_str: Optional[str] = None) -> str:
         """
         生成PDF文件（无章节跳转功能）
         
         Args:
             output_file: 输出文件路径，默认为当前目录下的汇总文件
+            html_str: 已由markdown_to_html()生成的HTML内容，为None时自动生成
             
         Returns:
             生成的PDF文件路径
@@ -414,8 +715,9 @@ class NfoParser:
             print("或者使用HTML格式输出")
             return ""
         
-        # 生成无跳转功能的HTML内容
-        html_content = self._generate_html_no_toc()
+        # 生成无跳转功能的HTML内容，直接以字符串交给wkhtmltopdf
+        if html_str is None:
+            html_str = self._generate_html_no_toc()
         
         # 写入文件
         if output_file is None:
@@ -446,7 +748,8 @@ class NfoParser:
             }
             
             # 生成PDF
-            pdfkit.from_string(html_content, str(output_file), options=options)
+            import pdfkit
+            pdfkit.from_string(html_str, str(output_file), options=options)
             print(f"PDF文件已生成: {output_file}")
             print("PDF包含目录结构，但不包含跳转功能")
             return str(output_file)
@@ -456,38 +759,34 @@ class NfoParser:
             print("请确保已安装wkhtmltopdf")
             return ""
     
-    def _generate_markdown_content(self) -> str:
+    def _build_markdown(self) -> List[str]:
         """
-        生成markdown内容（内部方法）
+        生成markdown内容的各行，结果按数据缓存
         
         Returns:
-            markdown内容字符串
+            markdown内容行列表
         """
-        if not self.video_data:
-            return ""
+        cache_key = id(self.video_data)
+        cached = self._markdown_cache.get(cache_key)
+        if cached is not None:
+            return cached[1]
         
-        # 生成markdown内容
         markdown_content = []
         markdown_content.append("# 心理科普视频内容汇总")
         markdown_content.append("")
-        markdown_content.append(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        markdown_content.append(f"生成时间: {self._timestamp()}")
         markdown_content.append(f"总计视频数量: {len(self.video_data)}")
         markdown_content.append("")
         
-        # 生成目录（无跳转链接）
+        # 生成目录
         markdown_content.append("## 📋 目录")
         markdown_content.append("")
         
         # 按类型分组生成目录
-        categorized_data = {}
-        for item in self.video_data:
-            tag = item['tag'] if item['tag'] else '未分类'
-            if tag not in categorized_data:
-                categorized_data[tag] = []
-            categorized_data[tag].append(item)
+        categorized_data = self._grouped()
         
-        # 生成目录结构（无跳转链接）
-        for tag, items in sorted(categorized_data.items()):
+        # 生成目录结构
+        for tag, items in categorized_data.items():
             markdown_content.append(f"### {tag}")
             for item in items:
                 markdown_content.append(f"- {item['title']}")
@@ -498,25 +797,22 @@ class NfoParser:
         
         # 按视频生成内容，每个视频一个独立章节
         for item in self.video_data:
-            # 视频标题作为二级标题
+            # 视频标题作为二级标题，Markdown会自动生成锚点
             markdown_content.append(f"## 视频标题：{item['title']}")
             markdown_content.append("")
             
             # 类型作为三级标题
-            tag = item['tag'] if item['tag'] else '未分类'
+            tag = item['tag'] or _UNCATEGORIZED
             markdown_content.append(f"### 视频类型：{tag}")
             markdown_content.append("")
             
             # 概要部分
             markdown_content.append("### 视频概要")
             if item['plot']:
-                # 格式化plot内容，保持原有的换行和缩进
-                plot_lines = item['plot'].split('\n')
-                for line in plot_lines:
-                    if line.strip():
-                        markdown_content.append(line)
-                    else:
-                        markdown_content.append("")
+                # 格式化plot内容，保持原有的换行和缩进，空白行置空；整段作为一项加入
+                markdown_content.append('\n'.join(
+                    line if line.strip() else '' for line in item['plot'].split('\n')
+                ))
             else:
                 markdown_content.append("暂无概要信息")
             
@@ -524,81 +820,20 @@ class NfoParser:
             markdown_content.append("---")
             markdown_content.append("")
         
-        return '\n'.join(markdown_content)
+        # 同时保留video_data的引用，保证缓存有效期内其id不会被复用
+        self._markdown_cache[cache_key] = (self.video_data, markdown_content)
+        return markdown_content
     
-    def _generate_markdown_content_with_toc(self) -> str:
+    def build_markdown_string(self) -> str:
         """
-        生成带跳转功能的markdown内容（用于HTML生成）
+        生成markdown内容，Markdown、HTML（PDF用）输出均由此派生
         
         Returns:
             markdown内容字符串
         """
         if not self.video_data:
             return ""
-        
-        # 生成markdown内容
-        markdown_content = []
-        markdown_content.append("# 心理科普视频内容汇总")
-        markdown_content.append("")
-        markdown_content.append(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        markdown_content.append(f"总计视频数量: {len(self.video_data)}")
-        markdown_content.append("")
-        
-        # 生成目录
-        markdown_content.append("## 📋 目录")
-        markdown_content.append("")
-        
-        # 按类型分组生成目录
-        categorized_data = {}
-        for item in self.video_data:
-            tag = item['tag'] if item['tag'] else '未分类'
-            if tag not in categorized_data:
-                categorized_data[tag] = []
-            categorized_data[tag].append(item)
-        
-        # 生成目录结构（带跳转链接）
-        for tag, items in sorted(categorized_data.items()):
-            markdown_content.append(f"### {tag}")
-            for item in items:
-                anchor = self._generate_anchor(item['title'])
-                markdown_content.append(f"- [{item['title']}](#{anchor})")
-            markdown_content.append("")
-        
-        markdown_content.append("---")
-        markdown_content.append("")
-        
-        # 按视频生成内容，每个视频一个独立章节
-        for item in self.video_data:
-            # 生成锚点ID
-            anchor = self._generate_anchor(item['title'])
-            
-            # 视频标题作为二级标题，Markdown会自动生成锚点
-            markdown_content.append(f"## 视频标题：{item['title']}")
-            markdown_content.append("")
-            
-            # 类型作为三级标题
-            tag = item['tag'] if item['tag'] else '未分类'
-            markdown_content.append(f"### 视频类型：{tag}")
-            markdown_content.append("")
-            
-            # 概要部分
-            markdown_content.append("### 视频概要")
-            if item['plot']:
-                # 格式化plot内容，保持原有的换行和缩进
-                plot_lines = item['plot'].split('\n')
-                for line in plot_lines:
-                    if line.strip():
-                        markdown_content.append(line)
-                    else:
-                        markdown_content.append("")
-            else:
-                markdown_content.append("暂无概要信息")
-            
-            markdown_content.append("")
-            markdown_content.append("---")
-            markdown_content.append("")
-        
-        return '\n'.join(markdown_content)
+        return '\n'.join(self._build_markdown())
     
     def _simple_markdown_to_html(self, markdown_text: str) -> str:
         """
@@ -612,20 +847,11 @@ class NfoParser:
         """
         html = markdown_text
         
-        # 标题转换
-        html = re.sub(r'^# (.*?)$', r'<h1>\1</h1>', html, flags=re.MULTILINE)
-        html = re.sub(r'^## (.*?)$', r'<h2>\1</h2>', html, flags=re.MULTILINE)
-        html = re.sub(r'^### (.*?)$', r'<h3>\1</h3>', html, flags=re.MULTILINE)
-        
-        # 链接转换
-        html = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', html)
+        # 标题、链接、列表项、分隔线转换（单次扫描）
+        html = _rx(_MD_PATTERN, re.MULTILINE).sub(_md_replace, html)
         
-        # 列表转换
-        html = re.sub(r'^- (.*?)$', r'<li>\1</li>', html, flags=re.MULTILINE)
-        html = re.sub(r'(<li>.*</li>)', r'<ul>\1</ul>', html, flags=re.DOTALL)
-        
-        # 分隔线转换
-        html = re.sub(r'^---$', r'<hr>', html, flags=re.MULTILINE)
+        # 列表包裹
+        html = _rx(_MD_UL_PATTERN, re.DOTALL).sub(r'<ul>\1</ul>', html)
         
         # 段落转换
         paragraphs = html.split('\n\n')
@@ -639,55 +865,37 @@ class NfoParser:
         
         return html
     
-    def _fix_anchor_links(self, html_content: str) -> str:
+    def _generate_html_no_toc(self) -> str:
         """
-        修复HTML中的锚点链接
+        生成无跳转功能的HTML内容（用于PDF生成）
         
-        Args:
-            html_content: HTML内容
-            
         Returns:
-            修复后的HTML内容
+            生成的HTML内容
         """
-        # 清理所有现有的锚点格式
-        html_content = re.sub(r'\{#([^}]+)\}', '', html_content)
-        html_content = re.sub(r'id="[^"]*"', '', html_content)
-        
-        # 为每个视频标题添加正确的锚点
-        def add_title_anchor(match):
-            title_text = match.group(1)
-            anchor = self._generate_anchor(title_text)
-            return f'<h2 id="{anchor}">视频标题：{title_text}</h2>'
-        
-        # 修复视频标题的锚点
-        html_content = re.sub(r'<h2[^>]*>视频标题：([^<]+)</h2>', add_title_anchor, html_content)
-        
-        # 修复目录中的链接，确保指向正确的锚点
-        def fix_toc_link(match):
-            link_text = match.group(1)
-            anchor = self._generate_anchor(link_text)
-            return f'<a href="#{anchor}">{link_text}</a>'
-        
-        # 修复目录中的链接
-        html_content = re.sub(r'<a href="#[^"]*">([^<]+)</a>', fix_toc_link, html_content)
+        if not self.video_data:
+            return ""
         
-        return html_content
+        return self.markdown_to_html(self.build_markdown_string())
     
-    def _generate_html_no_toc(self) -> str:
+    def markdown_to_html(self, markdown_content: str) -> str:
         """
-        生成无跳转功能的HTML内容（用于PDF生成）
+        将markdown内容转换为无跳转功能的完整HTML页面（用于PDF生成）
         
+        Args:
+            markdown_content: build_markdown_string()生成的markdown内容
+            
         Returns:
             生成的HTML内容
         """
-        if not self.video_data:
-            return ""
-        
-        # 首先生成markdown内容（无跳转）
-        markdown_content = self._generate_markdown_content()
+        # 相同的markdown内容只转换一次
+        cache_key = hashlib.blake2b(markdown_content.encode('utf-8')).digest()
+        cached = self._html_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         if MARKDOWN_AVAILABLE:
             # 使用markdown库转换为HTML
+            import markdown
             html_content = markdown.markdown(markdown_content, extensions=['toc', 'tables', 'fenced_code'])
         else:
             # 简单的markdown到HTML转换
@@ -752,6 +960,7 @@ class NfoParser:
 </body>
 </html>"""
         
+        self._html_cache[cache_key] = full_html
         return full_html
     
     def _generate_html_with_toc_for_pdf(self) -> str:
@@ -765,7 +974,7 @@ class NfoParser:
             return ""
         
         # 生成HTML内容，不使用markdown库，直接构建HTML以确保PDF兼容性
-        html_content = self._build_html_content_for_pdf()
+        html_content = self._build_html()
         
         # 添加专门为PDF优化的HTML模板
         full_html = f"""<!DOCTYPE html>
@@ -877,9 +1086,9 @@ class NfoParser:
         
         return full_html
     
-    def _build_html_content_for_pdf(self) -> str:
+    def _build_html(self) -> str:
         """
-        直接构建HTML内容，确保PDF锚点链接正确工作
+        直接从video_data构建带目录跳转链接和标题锚点的HTML内容，锚点在生成时即保证正确
         
         Returns:
             HTML内容字符串
@@ -888,7 +1097,7 @@ class NfoParser:
         
         # 标题和元信息
         html_parts.append('<h1>心理科普视频内容汇总</h1>')
-        html_parts.append(f'<div class="meta-info">生成时间: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</div>')
+        html_parts.append(f'<div class="meta-info">生成时间: {self._timestamp()}</div>')
         html_parts.append(f'<div class="meta-info">总计视频数量: {len(self.video_data)}</div>')
         
         # 生成目录
@@ -896,58 +1105,49 @@ class NfoParser:
         html_parts.append('<div class="toc">')
         
         # 按类型分组生成目录
-        categorized_data = {}
-        for item in self.video_data:
-            tag = item['tag'] if item['tag'] else '未分类'
-            if tag not in categorized_data:
-                categorized_data[tag] = []
-            categorized_data[tag].append(item)
-        
-        # 生成目录结构（带跳转链接）
-        for tag, items in sorted(categorized_data.items()):
-            html_parts.append(f'<h3>{tag}</h3>')
+        categorized_data = self._grouped()
+        
+        # 生成目录结构
+        for tag, items in categorized_data.items():
+            html_parts.append(f'<h3>{html.escape(tag, quote=False)}</h3>')
             html_parts.append('<ul>')
             for item in items:
                 anchor = self._generate_anchor(item['title'])
                 # 使用简单的锚点链接，确保PDF兼容性
-                html_parts.append(f'<li><a href="#{anchor}">{item["title"]}</a></li>')
+                title = html.escape(item['title'], quote=False)
+                html_parts.append(f'<li><a href="#{html.escape(anchor)}">{title}</a></li>')
             html_parts.append('</ul>')
         
         html_parts.append('</div>')
         html_parts.append('<hr>')
         
-        # 按视频生成内容，每个视频一个独立章节
+        # 按视频生成内容，每个视频一个独立章节，整节由模板一次格式化；
+        # 标题、类型和概要均为nfo中的原始文本，插入前转义HTML特殊字符
         for item in self.video_data:
-            # 生成锚点ID
-            anchor = self._generate_anchor(item['title'])
-            
-            # 视频标题作为二级标题，添加锚点
-            html_parts.append(f'<h2 id="{anchor}">视频标题：{item["title"]}</h2>')
-            
-            # 类型作为三级标题
-            tag = item['tag'] if item['tag'] else '未分类'
-            html_parts.append(f'<h3>视频类型：{tag}</h3>')
-            
-            # 概要部分
-            html_parts.append('<h3>视频概要</h3>')
             if item['plot']:
-                # 格式化plot内容，保持原有的换行和缩进
-                plot_lines = item['plot'].split('\n')
-                for line in plot_lines:
-                    if line.strip():
-                        html_parts.append(f'<p>{line}</p>')
-                    else:
-                        html_parts.append('<br>')
+                # 格式化plot内容，每行一个段落，空白行换为<br>
+                plot = '\n'.join(
+                    f'<p>{html.escape(line, quote=False)}</p>' if line.strip() else '<br>' for line in item['plot'].split('\n')
+                )
             else:
-                html_parts.append('<p>暂无概要信息</p>')
-            
-            html_parts.append('<hr>')
+                plot = '<p>暂无概要信息</p>'
+            html_parts.append(_HTML_ITEM_TEMPLATE.format_map({
+                'anchor': html.escape(self._generate_anchor(item['title'])),
+                'title': html.escape(item['title'], quote=False),
+                'tag': html.escape(item['tag'] or _UNCATEGORIZED, quote=False),
+                'plot': plot,
+            }))
         
         return '\n'.join(html_parts)
     
-    def _check_chinese_fonts(self):
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _check_chinese_fonts():
         """
         检查系统中是否安装了中文字体
+        
+        系统字体在进程运行期间不会变化，检查结果按进程缓存，
+        多次生成PDF时只启动一次fc-list/system_profiler子进程
         """
         import subprocess
         import platform
@@ -988,22 +1188,129 @@ class NfoParser:
             print("如果PDF中文显示异常，请确保系统已安装中文字体")
 
 
+class _TaskOutput:
+    """
+    并行生成文件时替换sys.stdout，在线程池中运行的任务的输出写入各自的缓冲区，
+    其他线程的输出直接写入原stdout
+    """
+    
+    def __init__(self, stream):
+        """
+        Args:
+            stream: 原来的sys.stdout
+        """
+        self.stream = stream
+        self._local = threading.local()
+    
+    def run(self, task) -> str:
+        """
+        运行任务并收集其输出
+        
+        Args:
+            task: 无参数的任务函数
+            
+        Returns:
+            任务运行期间打印的全部内容
+        """
+        buffer = io.StringIO()
+        self._local.buffer = buffer
+        try:
+            task()
+        finally:
+            self._local.buffer = None
+        return buffer.getvalue()
+    
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            return self.stream.write(text)
+        return buffer.write(text)
+    
+    def flush(self):
+        self.stream.flush()
+
+
+# 命令行参数的默认扫描目录和可选输出格式
+_DEFAULT_DIRECTORY = '/run/user/1000/gvfs/smb-share:server=10.86.230.130,share=home/my_projects/ShenY'
+_OUTPUT_FORMATS = ('md', 'html', 'pdf', 'all')
+
+
+def _open_in_browser(html_file: str):
+    """
+    在浏览器中打开HTML文件，在后台线程中运行，只在出错时输出
+
+    Args:
+        html_file: HTML文件路径
+    """
+    try:
+        import webbrowser
+        webbrowser.open(f'file://{os.path.abspath(html_file)}')
+    except Exception as e:
+        print(f"无法在浏览器中打开文件: {e}")
+
+
+def _parse_args_fast(argv: List[str]) -> Optional[types.SimpleNamespace]:
+    """
+    不借助argparse解析常见的命令行参数
+
+    只识别完整写法的选项和一个目录参数；遇到--help、选项缩写、
+    --option=value写法、非法取值等其他情况返回None，交由argparse处理并输出帮助或错误信息
+
+    Args:
+        argv: 去掉程序名后的命令行参数
+
+    Returns:
+        与argparse结果属性相同的命名空间，无法处理时返回None
+    """
+    args = types.SimpleNamespace(directory=_DEFAULT_DIRECTORY, output=None, format='md',
+                                 open=False, no_cache=False)
+    directory_given = False
+    remaining = iter(argv)
+    for arg in remaining:
+        if arg in ('-o', '--output', '-f', '--format'):
+            value = next(remaining, None)
+            if value is None or value.startswith('-'):
+                return None
+            if arg in ('-o', '--output'):
+                args.output = value
+            elif value in _OUTPUT_FORMATS:
+                args.format = value
+            else:
+                return None
+        elif arg == '--open':
+            args.open = True
+        elif arg == '--no-cache':
+            args.no_cache = True
+        elif arg.startswith('-') or directory_given:
+            return None
+        else:
+            args.directory = arg
+            directory_given = True
+    return args
+
+
 def main():
     """主函数"""
-    parser = argparse.ArgumentParser(description='NFO文件解析器 - 生成心理科普视频内容汇总')
-    parser.add_argument('directory', nargs='?', 
-                       default='/run/user/1000/gvfs/smb-share:server=10.86.230.130,share=home/my_projects/ShenY',
-                       help='要扫描的目录路径 (默认: 当前项目目录)')
-    parser.add_argument('-o', '--output', 
-                       help='输出文件路径 (默认: 目录下的心理科普视频内容汇总.{format})')
-    parser.add_argument('-f', '--format', 
-                       choices=['md', 'html', 'pdf', 'all'], 
-                       default='md',
-                       help='输出格式: md=Markdown, html=HTML, pdf=PDF, all=所有格式 (默认: md)')
-    parser.add_argument('--open', action='store_true',
-                       help='生成HTML后自动在浏览器中打开')
-    
-    args = parser.parse_args()
+    # 常见参数直接解析，仅在需要帮助或报错时才导入argparse
+    args = _parse_args_fast(sys.argv[1:])
+    if args is None:
+        import argparse
+        parser = argparse.ArgumentParser(description='NFO文件解析器 - 生成心理科普视频内容汇总')
+        parser.add_argument('directory', nargs='?', 
+                           default=_DEFAULT_DIRECTORY,
+                           help='要扫描的目录路径 (默认: 当前项目目录)')
+        parser.add_argument('-o', '--output', 
+                           help='输出文件路径 (默认: 目录下的心理科普视频内容汇总.{format})')
+        parser.add_argument('-f', '--format', 
+                           choices=_OUTPUT_FORMATS, 
+                           default='md',
+                           help='输出格式: md=Markdown, html=HTML, pdf=PDF, all=所有格式 (默认: md)')
+        parser.add_argument('--open', action='store_true',
+                           help='生成HTML后自动在浏览器中打开')
+        parser.add_argument('--no-cache', action='store_true',
+                           help='不使用解析结果缓存，重新解析所有nfo文件')
+        
+        args = parser.parse_args()
     
     print("=" * 60)
     print("NFO文件解析器启动")
@@ -1012,8 +1319,9 @@ def main():
     print(f"输出格式: {args.format}")
     
     # 检查依赖
-    if args.format in ['html', 'pdf', 'all'] and not MARKDOWN_AVAILABLE:
-        print("警告：未安装markdown库，HTML和PDF功能可能受限")
+    # HTML文件直接由数据生成，只有PDF需要经markdown库转换
+    if args.format in ['pdf', 'all'] and not MARKDOWN_AVAILABLE:
+        print("警告：未安装markdown库，PDF功能可能受限")
         print("建议运行：pip install markdown")
     
     if args.format in ['pdf', 'all'] and not PDFKIT_AVAILABLE:
@@ -1034,7 +1342,7 @@ def main():
             args.format = 'html'
     
     # 创建解析器实例
-    nfo_parser = NfoParser(args.directory)
+    nfo_parser = NfoParser(args.directory, use_cache=not args.no_cache)
     
     # 处理所有nfo文件
     video_data = nfo_parser.process_all_nfo_files()
@@ -1044,36 +1352,61 @@ def main():
         print("开始生成文件...")
         print("=" * 60)
         
-        # 根据格式生成文件
-        if args.format == 'md' or args.format == 'all':
+        # markdown内容只生成一次，Markdown文件和PDF用HTML都由它派生
+        markdown_text = ''
+        if args.format in ('md', 'pdf', 'all'):
+            markdown_text = nfo_parser.build_markdown_string()
+        
+        # 根据格式生成文件，各格式互不依赖
+        def write_markdown():
             output_file = args.output
             if output_file and not output_file.endswith('.md'):
                 output_file += '.md'
-            nfo_parser.generate_markdown(output_file)
+            nfo_parser.generate_markdown(output_file, markdown_text)
         
-        if args.format == 'html' or args.format == 'all':
+        def write_html():
             output_file = args.output
             if output_file and not output_file.endswith('.html'):
                 output_file += '.html'
-            html_file = nfo_parser.generate_html(output_file)
+            html_file = output_file or str(nfo_parser.base_directory / "心理科普视频内容汇总.html")
+            html_content = nfo_parser.generate_html(html_file)
             
-            # 如果指定了--open参数，在浏览器中打开HTML文件
-            if args.open and html_file:
-                try:
-                    webbrowser.open(f'file://{Path(html_file).absolute()}')
-                    print(f"已在浏览器中打开: {html_file}")
-                except Exception as e:
-                    print(f"无法在浏览器中打开文件: {e}")
+            # 如果指定了--open参数，在后台线程中打开HTML文件，浏览器启动期间继续生成PDF；
+            # 非守护线程，进程退出前会等待其完成
+            if args.open and html_content:
+                threading.Thread(target=_open_in_browser, args=(html_file,)).start()
+                print(f"正在浏览器中打开: {html_file}")
         
-        if args.format == 'pdf' or args.format == 'all':
+        def write_pdf():
             if PDFKIT_AVAILABLE:
                 output_file = args.output
                 if output_file and not output_file.endswith('.pdf'):
                     output_file += '.pdf'
-                nfo_parser.generate_pdf(output_file)
+                pdf_html = nfo_parser.markdown_to_html(markdown_text)
+                nfo_parser.generate_pdf(output_file, pdf_html)
             else:
                 print("跳过PDF生成（缺少依赖）")
         
+        if args.format == 'all':
+            # 三种格式并行生成，总耗时接近最慢的PDF一项；分类分组已在上面生成markdown内容时完成，
+            # 各线程直接复用。各任务的输出先缓存，完成后按固定顺序打印，避免多线程输出交错
+            task_output = _TaskOutput(sys.stdout)
+            sys.stdout = task_output
+            try:
+                with ThreadPoolExecutor(max_workers=3) as executor:
+                    futures = [executor.submit(task_output.run, task)
+                               for task in (write_markdown, write_html, write_pdf)]
+            finally:
+                sys.stdout = task_output.stream
+            for future in futures:
+                print(future.result(), end='')
+        elif args.format == 'md':
+            write_markdown()
+        elif args.format == 'html':
+            write_html()
+        else:
+            write_pdf()
+        
         print("=" * 60)
         print("处理完成！")
         print("=" * 60)